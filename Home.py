@@ -1,13 +1,155 @@
 import streamlit as st
-import sys
-import os
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import folium
+from streamlit_folium import st_folium
 
-# Add current directory to path so we can import our modules
-sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
-
-from data.solar_data import get_solar_data
+from data.solar_data import get_solar_data, get_solar_data_many
 from models.roi_calculator import SolarROICalculator
 
+# 25-year panel degradation factors (0.5%/year), folded once at import time
+_DECAY_25Y = (1.0 - 0.005) ** np.arange(1, 26)
+
+
+@st.cache_data(ttl=86400, max_entries=128, show_spinner=False)
+def fetch_solar_data(lat, lon, start_date, end_date):
+    """Cached NASA POWER fetch - repeat queries skip the HTTP round-trip."""
+    return get_solar_data(lat, lon, start_date, end_date)
+
+
+@st.cache_data(ttl=86400, max_entries=32, show_spinner=False)
+def fetch_solar_data_many(coords, start_date, end_date):
+    """Cached concurrent fetch for the multi-location comparison."""
+    return get_solar_data_many(coords, start_date, end_date)
+
+
+@st.cache_resource(show_spinner=False)
+def get_calculator():
+    """Singleton calculator - stateless, so one instance serves all reruns."""
+    return SolarROICalculator()
+
+
+@st.cache_data(show_spinner=False)
+def calculate_roi(avg_irradiance, system_size, electricity_rate):
+    """Cached ROI calculation - pure function of its inputs."""
+    return get_calculator().calculate_roi(avg_irradiance, system_size, electricity_rate)
+
+
+@st.cache_data(show_spinner=False)
+def csv_bytes(solar_data):
+    """Cached CSV serialization - the DataFrame exists only for export."""
+    df = pd.DataFrame(
+        {'solar_irradiance': solar_data['irradiance']},
+        index=solar_data['dates']
+    )
+    return df.to_csv().encode()
+
+
+@st.cache_data(show_spinner=False)
+def cashflow_series(total_investment, annual_production, electricity_rate):
+    """Cached 26-point cumulative cash series, shared between the chart
+    and the break-even estimate."""
+    revenues = annual_production * electricity_rate * _DECAY_25Y
+    cumulative_cash = np.empty(26, dtype=np.float64)
+    cumulative_cash[0] = -total_investment
+    cumulative_cash[1:] = -total_investment + np.cumsum(revenues)
+    return cumulative_cash
+
+
+def breakeven_year_from(cumulative_cash):
+    """Interpolated break-even year from the cumulative cash series.
+
+    Unlike the calculator's simple capex/revenue ratio, this accounts
+    for panel degradation since the series already includes it. Returns
+    None if the system never breaks even within the horizon.
+    """
+    idx = int(np.searchsorted(cumulative_cash, 0.0))
+    if idx == 0 or idx >= len(cumulative_cash):
+        return None
+    frac = -cumulative_cash[idx - 1] / (cumulative_cash[idx] - cumulative_cash[idx - 1])
+    return idx - 1 + frac
+
+
+@st.cache_data(show_spinner=False)
+def cashflow_fig(total_investment, annual_production, electricity_rate):
+    """Cached cash-flow figure spec - go.Figure construction and its
+    validation overhead run only when the inputs change; reruns replay
+    the plain dict. uirevision keeps user zoom across updates."""
+    cumulative_cash = cashflow_series(
+        total_investment, annual_production, electricity_rate
+    )
+
+    fig = go.Figure()
+
+    fig.add_trace(go.Scatter(
+        x=np.arange(0, 26),
+        y=cumulative_cash,
+        fill='tozeroy',
+        name='Cumulative Cash Flow',
+        line=dict(color='#10b981', width=3),
+        fillcolor='rgba(16, 185, 129, 0.2)'
+    ))
+
+    fig.add_hline(
+        y=0,
+        line_dash="dash",
+        line_color="red",
+        annotation_text="Break Even Point",
+        annotation_position="right"
+    )
+
+    fig.update_layout(
+        xaxis_title="Year",
+        yaxis_title="Cumulative Cash Flow ($)",
+        hovermode='closest',
+        uirevision='cashflow',
+        height=400
+    )
+
+    return fig.to_dict()
+
+
+@st.cache_data(show_spinner=False)
+def site_popup_html(irradiance, roi, payback):
+    """Cached marker popup - call with rounded values so reruns reuse it."""
+    return f"""
+    <b>Solar Site Analysis</b><br>
+    Irradiance: {irradiance:.2f} kWh/m²/day<br>
+    ROI: {roi:.1f}%<br>
+    Payback: {payback:.1f} years
+    """
+
+
+@st.cache_resource(show_spinner=False)
+def build_site_map(lat, lon, popup_html):
+    """Cached folium map - skips marker/HTML rebuild on repeat renders."""
+    m = folium.Map(
+        location=[lat, lon],
+        zoom_start=10,
+        tiles='OpenStreetMap',
+        prefer_canvas=True
+    )
+
+    folium.Marker(
+        [lat, lon],
+        popup=popup_html,
+        icon=folium.Icon(color='orange', icon='sun', prefix='fa')
+    ).add_to(m)
+
+    # CircleMarker renders on the canvas layer; Circle is SVG-only
+    folium.CircleMarker(
+        [lat, lon],
+        radius=20,
+        color='orange',
+        fill=True,
+        fillOpacity=0.2,
+        popup='Proposed Solar Farm Area'
+    ).add_to(m)
+
+    return m
+
+
 st.set_page_config(
     page_title="Solar ROI Predictor - NASA Techies",
     page_icon="☀️",
@@ -60,8 +202,8 @@ if 'analyzed' not in st.session_state:
     st.session_state.analyzed = False
 if 'results' not in st.session_state:
     st.session_state.results = None
-if 'solar_df' not in st.session_state:
-    st.session_state.solar_df = None
+if 'solar_data' not in st.session_state:
+    st.session_state.solar_data = None
 if 'avg_irradiance' not in st.session_state:
     st.session_state.avg_irradiance = None
 if 'comparison_done' not in st.session_state:
@@ -112,186 +254,170 @@ with st.sidebar:
         st.rerun()
     st.caption("Lat: 25.76, Lon: -80.19")
 
-# Main area
-st.subheader("Analyze Solar Investment Returns using NASA Satellite Data")
+@st.fragment
+def render_results():
+    """Render metrics, charts and map for the analyzed location.
 
-if st.session_state.analyzed:
-    # Only fetch data if we don't have it yet or parameters changed
-    if (st.session_state.results is None or
-        st.session_state.latitude != latitude or
-        st.session_state.longitude != longitude or
-        st.session_state.system_size != system_size or
-        st.session_state.electricity_rate != electricity_rate):
-
-        # Update session state with current values
-        st.session_state.latitude = latitude
-        st.session_state.longitude = longitude
-        st.session_state.system_size = system_size
-        st.session_state.electricity_rate = electricity_rate
+    Runs as a fragment so interactions inside it (map panning, chart
+    tools, CSV download) rerun only this block, not the whole script.
+    """
+    results = st.session_state.results
+    solar_data = st.session_state.solar_data
+    avg_irradiance = st.session_state.avg_irradiance
 
-        with st.spinner("🛰️ Fetching NASA satellite data..."):
-            solar_df = get_solar_data(latitude, longitude, '2024-01-01', '2024-12-31')
-
-        if solar_df is not None:
-            avg_irradiance = solar_df['solar_irradiance'].mean()
+    st.success("✅ Analysis complete!")
 
-            # Calculate ROI
-            calculator = SolarROICalculator()
-            results = calculator.calculate_roi(avg_irradiance, system_size, electricity_rate)
+    # Display metrics in columns
+    col1, col2, col3, col4 = st.columns(4)
 
-            # Store in session state
-            st.session_state.solar_df = solar_df
-            st.session_state.avg_irradiance = avg_irradiance
-            st.session_state.results = results
-        else:
-            st.error("❌ Failed to fetch solar data. Please check your coordinates and try again.")
-            st.session_state.analyzed = False
-
-    # Display results from session state
-    if st.session_state.results is not None:
-        results = st.session_state.results
-        solar_df = st.session_state.solar_df
-        avg_irradiance = st.session_state.avg_irradiance
+    col1.metric(
+        "ROI (25 years)",
+        f"{results['roi_percent']:.1f}%",
+        delta="Profit" if results['roi_percent'] > 0 else "Loss"
+    )
+    col2.metric(
+        "Payback Period",
+        f"{results['payback_period_years']:.1f} years"
+    )
+    col3.metric(
+        "Annual Production",
+        f"{results['annual_production_kwh']:,.0f} kWh"
+    )
+    col4.metric(
+        "Total Investment",
+        f"${results['total_investment']:,.0f}"
+    )
 
-        st.success("✅ Analysis complete!")
+    # Additional info
+    st.divider()
 
-        # Display metrics in columns
-        col1, col2, col3, col4 = st.columns(4)
+    col_a, col_b = st.columns(2)
 
-        col1.metric(
-            "ROI (25 years)",
-            f"{results['roi_percent']:.1f}%",
-            delta="Profit" if results['roi_percent'] > 0 else "Loss"
-        )
-        col2.metric(
-            "Payback Period",
-            f"{results['payback_period_years']:.1f} years"
-        )
-        col3.metric(
-            "Annual Production",
-            f"{results['annual_production_kwh']:,.0f} kWh"
-        )
-        col4.metric(
-            "Total Investment",
-            f"${results['total_investment']:,.0f}"
+    with col_a:
+        st.metric(
+            "Net Profit (25 years)",
+            f"${results['net_profit']:,.0f}"
         )
 
-        # Additional info
-        st.divider()
+    with col_b:
+        st.metric(
+            "Average Solar Irradiance",
+            f"{avg_irradiance:.2f} kWh/m²/day"
+        )
 
-        col_a, col_b = st.columns(2)
+    # Show irradiance chart - weekly means via WebGL instead of 365 daily
+    # points through the Vega-Lite bridge
+    st.divider()
+    st.subheader("📈 Solar Irradiance - 2024 (Weekly Average)")
+
+    irradiance = pd.Series(solar_data['irradiance'], index=solar_data['dates'])
+    weekly = irradiance.resample('W').mean()
+
+    fig_irr = go.Figure(go.Scattergl(
+        x=weekly.index,
+        y=weekly.values,
+        line=dict(color='#f59e0b', width=2),
+        name='Solar Irradiance'
+    ))
+    fig_irr.update_layout(
+        xaxis_title="Date",
+        yaxis_title="Irradiance (kWh/m²/day)",
+        height=400
+    )
+    st.plotly_chart(
+        fig_irr,
+        use_container_width=True,
+        config={'displayModeBar': False, 'responsive': True}
+    )
 
-        with col_a:
-            st.metric(
-                "Net Profit (25 years)",
-                f"${results['net_profit']:,.0f}"
-            )
+    # Download data option
+    st.divider()
+    st.download_button(
+        label="📥 Download Solar Data (CSV)",
+        data=csv_bytes(solar_data),
+        file_name=f"solar_data_{st.session_state.latitude}_{st.session_state.longitude}.csv",
+        mime="text/csv"
+    )
 
-        with col_b:
-            st.metric(
-                "Average Solar Irradiance",
-                f"{avg_irradiance:.2f} kWh/m²/day"
-            )
+    # Cash Flow Projection
+    st.divider()
+    st.subheader("💰 25-Year Cash Flow Projection")
+
+    st.plotly_chart(
+        cashflow_fig(
+            results['total_investment'],
+            results['annual_production_kwh'],
+            st.session_state.electricity_rate
+        ),
+        use_container_width=True,
+        config={'displayModeBar': False, 'responsive': True}
+    )
 
-        # Show irradiance chart
-        st.divider()
-        st.subheader("📈 Daily Solar Irradiance - 2024")
-        st.line_chart(solar_df, use_container_width=True)
+    breakeven_year = breakeven_year_from(cashflow_series(
+        results['total_investment'],
+        results['annual_production_kwh'],
+        st.session_state.electricity_rate
+    ))
+    if breakeven_year is not None:
+        st.info(f"💡 You'll break even in year {breakeven_year:.1f}. After that, it's pure profit!")
+    else:
+        st.warning("⚠️ This system doesn't break even within the 25-year horizon.")
 
-        # Download data option
-        st.divider()
-        csv = solar_df.to_csv()
-        st.download_button(
-            label="📥 Download Solar Data (CSV)",
-            data=csv,
-            file_name=f"solar_data_{st.session_state.latitude}_{st.session_state.longitude}.csv",
-            mime="text/csv"
+    # Interactive Map
+    st.divider()
+    st.subheader("🗺️ Location Map")
+
+    m = build_site_map(
+        st.session_state.latitude,
+        st.session_state.longitude,
+        site_popup_html(
+            round(avg_irradiance, 2),
+            round(results['roi_percent'], 1),
+            round(results['payback_period_years'], 1)
         )
+    )
 
-        # Cash Flow Projection
-        st.divider()
-        st.subheader("💰 25-Year Cash Flow Projection")
-
-        import plotly.graph_objects as go
-
-        years = list(range(0, 26))
-        cumulative_cash = [-results['total_investment']]
-        cash = -results['total_investment']
-
-        for year in range(1, 26):
-            annual_revenue = (
-                results['annual_production_kwh'] *
-                st.session_state.electricity_rate *
-                ((1 - 0.005) ** year)
-            )
-            cash += annual_revenue
-            cumulative_cash.append(cash)
-
-        fig = go.Figure()
-
-        fig.add_trace(go.Scatter(
-            x=years,
-            y=cumulative_cash,
-            fill='tozeroy',
-            name='Cumulative Cash Flow',
-            line=dict(color='#10b981', width=3),
-            fillcolor='rgba(16, 185, 129, 0.2)'
-        ))
-
-        fig.add_hline(
-            y=0,
-            line_dash="dash",
-            line_color="red",
-            annotation_text="Break Even Point",
-            annotation_position="right"
-        )
+    st_folium(m, width=700, height=400)
 
-        fig.update_layout(
-            xaxis_title="Year",
-            yaxis_title="Cumulative Cash Flow ($)",
-            hovermode='x unified',
-            height=400
-        )
 
-        st.plotly_chart(fig, use_container_width=True)
+# Main area
+st.subheader("Analyze Solar Investment Returns using NASA Satellite Data")
 
-        breakeven_year = results['payback_period_years']
-        st.info(f"💡 You'll break even in year {breakeven_year:.1f}. After that, it's pure profit!")
+if st.session_state.analyzed:
+    # One tuple compare decides whether to refetch, instead of checking
+    # four session-state entries individually
+    params_key = (latitude, longitude, system_size, electricity_rate)
 
-        # Interactive Map
-        st.divider()
-        st.subheader("🗺️ Location Map")
+    if st.session_state.get('cached_key') != params_key:
+        st.session_state.latitude = latitude
+        st.session_state.longitude = longitude
+        st.session_state.system_size = system_size
+        st.session_state.electricity_rate = electricity_rate
 
-        import folium
-        from streamlit_folium import st_folium
+        with st.spinner("🛰️ Fetching NASA satellite data..."):
+            solar_data = fetch_solar_data(latitude, longitude, '2024-01-01', '2024-12-31')
 
-        m = folium.Map(
-            location=[st.session_state.latitude, st.session_state.longitude],
-            zoom_start=10,
-            tiles='OpenStreetMap'
-        )
+        if solar_data is not None:
+            avg_irradiance = float(solar_data['irradiance'].mean())
 
-        folium.Marker(
-            [st.session_state.latitude, st.session_state.longitude],
-            popup=f"""
-            <b>Solar Site Analysis</b><br>
-            Irradiance: {avg_irradiance:.2f} kWh/m²/day<br>
-            ROI: {results['roi_percent']:.1f}%<br>
-            Payback: {results['payback_period_years']:.1f} years
-            """,
-            icon=folium.Icon(color='orange', icon='sun', prefix='fa')
-        ).add_to(m)
+            # Calculate ROI
+            results = calculate_roi(avg_irradiance, system_size, electricity_rate)
 
-        folium.Circle(
-            [st.session_state.latitude, st.session_state.longitude],
-            radius=500,
-            color='orange',
-            fill=True,
-            fillOpacity=0.2,
-            popup='Proposed Solar Farm Area'
-        ).add_to(m)
+            # Store in session state
+            st.session_state.solar_data = solar_data
+            st.session_state.avg_irradiance = avg_irradiance
+            st.session_state.results = results
+            st.session_state.cached_key = params_key
+        else:
+            # Drop the cached None so the next Analyze click retries the
+            # request instead of replaying the failure for the TTL
+            fetch_solar_data.clear(latitude, longitude, '2024-01-01', '2024-12-31')
+            st.error("❌ Failed to fetch solar data. Please check your coordinates and try again.")
+            st.session_state.analyzed = False
 
-        st_folium(m, width=700, height=400)
+    # Display results from session state
+    if st.session_state.results is not None:
+        render_results()
 
         # Add comparison feature after analysis
         st.divider()
@@ -410,20 +536,25 @@ if st.session_state.comparison_done:
     # Only fetch if we don't have data yet
     if st.session_state.comparison_data is None:
         comparison_data = []
+        failed_locations = []
 
-        progress_bar = st.progress(0)
         status_text = st.empty()
+        status_text.text("Fetching data for all locations...")
 
-        for idx, (lat, lon, name) in enumerate(locations):
-            status_text.text(f"Fetching data for {name}...")
+        # All three NASA queries go out concurrently instead of one at a time
+        coords = tuple((lat, lon) for lat, lon, _ in locations)
+        solar_datasets = fetch_solar_data_many(coords, '2024-01-01', '2024-12-31')
 
-            solar_df = get_solar_data(lat, lon, '2024-01-01', '2024-12-31')
+        if any(solar_data is None for solar_data in solar_datasets):
+            # Drop the cached batch so the next compare retries the failed
+            # fetches instead of replaying them for the TTL
+            fetch_solar_data_many.clear(coords, '2024-01-01', '2024-12-31')
 
-            if solar_df is not None:
-                avg_irradiance = solar_df['solar_irradiance'].mean()
+        for (lat, lon, name), solar_data in zip(locations, solar_datasets):
+            if solar_data is not None:
+                avg_irradiance = float(solar_data['irradiance'].mean())
 
-                calculator = SolarROICalculator()
-                results = calculator.calculate_roi(avg_irradiance, comp_system_size, comp_elec_rate)
+                results = calculate_roi(avg_irradiance, comp_system_size, comp_elec_rate)
 
                 comparison_data.append({
                     'Location': name,
@@ -435,26 +566,27 @@ if st.session_state.comparison_done:
                     'Annual Production (kWh)': f"{results['annual_production_kwh']:,.0f}",
                     'Net Profit ($)': f"${results['net_profit']:,.0f}"
                 })
-
-            progress_bar.progress((idx + 1) / 3)
+            else:
+                failed_locations.append(name)
 
         status_text.text("✅ Comparison complete!")
         st.session_state.comparison_data = comparison_data
+        st.session_state.comparison_failed = failed_locations
     else:
         comparison_data = st.session_state.comparison_data
 
+    for name in st.session_state.get('comparison_failed', []):
+        st.warning(f"⚠️ Could not fetch data for {name} - excluded from the comparison.")
+
     # Display comparison table
     st.subheader("📊 Comparison Results")
 
-    import pandas as pd
     df_comparison = pd.DataFrame(comparison_data)
     st.dataframe(df_comparison, use_container_width=True)
 
     # Visual comparison charts
     st.subheader("📈 Visual Comparison")
 
-    import plotly.graph_objects as go
-
     # ROI Comparison Bar Chart
     fig_roi = go.Figure(data=[
         go.Bar(
@@ -494,9 +626,6 @@ if st.session_state.comparison_done:
     # Map with all locations
     st.subheader("🗺️ All Locations on Map")
 
-    import folium
-    from streamlit_folium import st_folium
-
     # Calculate center point
     avg_lat = sum([loc[0] for loc in locations]) / 3
     avg_lon = sum([loc[1] for loc in locations]) / 3
@@ -504,10 +633,10 @@ if st.session_state.comparison_done:
     m = folium.Map(location=[avg_lat, avg_lon], zoom_start=4)
 
     colors = ['red', 'blue', 'green']
-    for idx, (lat, lon, name) in enumerate(locations):
+    for idx, item in enumerate(comparison_data):
         folium.Marker(
-            [lat, lon],
-            popup=f"<b>{name}</b><br>{comparison_data[idx]['ROI (%)']} ROI",
+            [item['Latitude'], item['Longitude']],
+            popup=f"<b>{item['Location']}</b><br>{item['ROI (%)']} ROI",
             icon=folium.Icon(color=colors[idx], icon='sun', prefix='fa')
         ).add_to(m)
 
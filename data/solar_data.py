@@ -1,13 +1,18 @@
 import requests
+import numpy as np
 import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
 
 def get_solar_data(lat, lon, start_date, end_date):
     """
     Fetch solar irradiance from NASA POWER API
     Free, no authentication required!
+
+    Returns a dict of NumPy arrays ('dates', 'irradiance') - cheaper to
+    build than a DataFrame; callers make pandas objects only when needed
     """
     base_url = "https://power.larc.nasa.gov/api/temporal/daily/point"
-    
+
     params = {
         'parameters': 'ALLSKY_SFC_SW_DWN',  # Solar irradiance
         'community': 'RE',  # Renewable Energy
@@ -17,32 +22,44 @@ def get_solar_data(lat, lon, start_date, end_date):
         'end': end_date.replace('-', ''),
         'format': 'JSON'
     }
-    
+
     try:
         response = requests.get(base_url, params=params)
         response.raise_for_status()
         data = response.json()
-        
-        # Convert to DataFrame
-        df = pd.DataFrame.from_dict(
-            data['properties']['parameter']['ALLSKY_SFC_SW_DWN'], 
-            orient='index',
-            columns=['solar_irradiance']
-        )
-        
-        return df
+
+        series = data['properties']['parameter']['ALLSKY_SFC_SW_DWN']
+
+        return {
+            'dates': pd.to_datetime(list(series.keys()), format='%Y%m%d').to_numpy(),
+            # FP32 is plenty for 2-decimal daily values and halves the
+            # bytes moved on every reduction, plot and CSV export
+            'irradiance': np.asarray(list(series.values()), dtype=np.float32)
+        }
     except Exception as e:
         print(f"Error fetching data: {e}")
         return None
 
+def get_solar_data_many(coords, start_date, end_date):
+    """
+    Fetch several (lat, lon) locations concurrently
+    One round-trip's worth of waiting instead of one per location
+    """
+    with ThreadPoolExecutor(max_workers=len(coords)) as pool:
+        futures = [
+            pool.submit(get_solar_data, lat, lon, start_date, end_date)
+            for lat, lon in coords
+        ]
+        return [f.result() for f in futures]
+
 # Test the function
 if __name__ == "__main__":
     # Test with San Francisco coordinates
     print("Testing NASA API...")
-    df = get_solar_data(37.7749, -122.4194, '2023-01-01', '2023-12-31')
-    if df is not None:
+    solar = get_solar_data(37.7749, -122.4194, '2023-01-01', '2023-12-31')
+    if solar is not None:
         print("✅ API works!")
-        print(f"Average solar irradiance: {df['solar_irradiance'].mean():.2f} kWh/m²/day")
-        print(f"Data points collected: {len(df)}")
+        print(f"Average solar irradiance: {solar['irradiance'].mean():.2f} kWh/m²/day")
+        print(f"Data points collected: {len(solar['irradiance'])}")
     else:
-        print("❌ API failed")
\ No newline at end of file
+        print("❌ API failed")
@@ -29,12 +29,11 @@ class SolarROICalculator:
         # Financial calculations
         capex = system_size_kw * self.system_cost_per_kw
         
-        total_revenue = 0
-        for year in range(1, years + 1):
-            # Account for panel degradation
-            year_production = annual_kwh * ((1 - self.degradation_rate) ** year)
-            year_revenue = year_production * electricity_rate
-            total_revenue += year_revenue
+        # Degraded production forms a geometric series, so sum it in
+        # closed form instead of looping year by year
+        retention = 1 - self.degradation_rate
+        degradation_sum = retention * (1 - retention ** years) / (1 - retention)
+        total_revenue = annual_kwh * electricity_rate * degradation_sum
         
         # Calculate metrics
         roi_percent = ((total_revenue - capex) / capex) * 100